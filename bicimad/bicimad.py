@@ -1,11 +1,62 @@
+import hashlib
 import io
+import os
 import re
+import shutil
+import tempfile
 import zipfile
-from typing import TextIO
+from contextlib import ExitStack
+from functools import cached_property
+from pathlib import Path
+from typing import IO, BinaryIO, Optional
 from urllib.parse import urljoin
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# Sesión compartida para reutilizar conexiones (keep-alive) con opendata.emtmadrid.es
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_TIMEOUT = 30
+# Tamaño a partir del cual el ZIP descargado se vuelca del buffer en memoria a disco
+_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# Patrón general para encontrar URLs de csv
+_LINK_RE = re.compile(r'getattachment/.*?trips_\d{2}_\d{2}_[a-zA-Z]+-csv\.aspx')
+# Año y mes dentro de una URL de csv
+_URL_DATE_RE = re.compile(r'trips_(\d{2})_(\d{2})_')
+
+
+class _ZipMemberStream(io.BufferedIOBase):
+    """Flujo binario de un miembro de un ZIP que, al cerrarse, cierra también el ZIP y el fichero que lo contiene."""
+
+    def __init__(self, member: BinaryIO, resources: ExitStack):
+        self._member = member
+        self._resources = resources
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self._member.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._member.read1(size)
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        return self._member.readline(size)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._resources.close()
+        super().close()
 
 
 class UrlEMT:
@@ -14,8 +65,31 @@ class UrlEMT:
     EMT = r"https://opendata.emtmadrid.es/"
     GENERAL = r"/Datos-estaticos/Datos-generales-(1)"
 
+    # Enlaces e índice (año, mes) -> URL compartidos entre instancias, para no descargar la página en cada
+    # construcción
+    _enlaces_cache: Optional[frozenset[str]] = None
+    _indice_cache: Optional[dict[tuple[int, int], str]] = None
+
     def __init__(self):
-        self.enlaces_validos = UrlEMT.select_valid_urls()
+        if UrlEMT._enlaces_cache is None:
+            enlaces = frozenset(UrlEMT.select_valid_urls())
+
+            # El índice se construye una sola vez para que get_url no recorra todos los enlaces
+            indice = {}
+            for url in enlaces:
+                match = _URL_DATE_RE.search(url)
+                if match:
+                    indice[(int(match.group(1)), int(match.group(2)))] = url
+
+            UrlEMT._enlaces_cache, UrlEMT._indice_cache = enlaces, indice
+        self.enlaces_validos = UrlEMT._enlaces_cache
+        self._indice = UrlEMT._indice_cache
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Descarta los enlaces cacheados para que la siguiente instancia vuelva a consultar la web de EMT."""
+        cls._enlaces_cache = None
+        cls._indice_cache = None
 
     def get_url(self, month: int, year: int) -> str:
         """
@@ -28,39 +102,44 @@ class UrlEMT:
         """
         if not (1 <= month <= 12):
             raise ValueError("El mes debe ser un número entre 1 y 12.")
-        if year not in [21, 22, 23]:
+        if year not in {21, 22, 23}:
             raise ValueError("El año debe ser 21, 22 o 23.")
 
-        search_str = f"{year}_{month:02}"
-        for url in self.enlaces_validos:
-            if search_str in url:
-                return url
-        raise ValueError(f"No existe un enlace valido para el mes {month} del año {year}")
+        try:
+            return self._indice[(year, month)]
+        except KeyError:
+            raise ValueError(f"No existe un enlace valido para el mes {month} del año {year}") from None
 
-    def get_csv(self, month: int, year: int) -> TextIO:
+    def get_csv(self, month: int, year: int) -> BinaryIO:
         """
-        Descarga un archivo ZIP desde una URL, extrae un archivo CSV del ZIP y lo devuelve como un flujo de texto
-        (TextIO).
+        Descarga un archivo ZIP desde una URL, extrae un archivo CSV del ZIP y lo devuelve como un flujo binario
+        (BinaryIO) codificado en UTF-8.
 
         :param month: Mes en formato numérico (1-12).
         :param year: Año en formato numérico (21, 22 o 23).
         :raises ConnectionError: Si falla la conexión a la URL.
-        :returns: Objeto TextIO que contiene el contenido del archivo CSV.
+        :returns: Objeto BinaryIO que contiene el contenido del archivo CSV. Al cerrarlo se liberan también el ZIP y
+        el fichero temporal en el que se descargó.
         """
         url = self.get_url(month, year)
-        resp = requests.get(url)
+        with _SESSION.get(url, timeout=_TIMEOUT, stream=True) as resp:
+            if resp.status_code != 200:
+                raise ConnectionError(f"Failed to connect to {url}, status code: {resp.status_code}")
 
-        if resp.status_code != 200:
-            raise ConnectionError(f"Failed to connect to {url}, status code: {resp.status_code}")
+            # El temporal, el ZIP y el miembro se cierran juntos al cerrar el flujo devuelto (o si algo falla aquí)
+            with ExitStack() as resources:
+                # Se copia la respuesta por bloques, sin cargar el ZIP completo en memoria
+                zip_file = resources.enter_context(tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE))
+                resp.raw.decode_content = True
+                shutil.copyfileobj(resp.raw, zip_file)
 
-        zip_bytes = io.BytesIO(resp.content)
-        zfile = zipfile.ZipFile(zip_bytes)
+                zip_file.seek(0)
+                zfile = resources.enter_context(zipfile.ZipFile(zip_file))
 
-        name_csv = self.get_name_csv(month, year)
-        with zfile.open(name_csv) as f:
-            contents = f.read()
-            content_str = contents.decode('utf-8')
-            csv_stream = io.StringIO(content_str)
+                name_csv = self.get_name_csv(month, year)
+                # Se devuelve el flujo binario: pandas decodifica el UTF-8 en su propio parser
+                member = resources.enter_context(zfile.open(name_csv))
+                csv_stream = _ZipMemberStream(member, resources.pop_all())
 
         return csv_stream
 
@@ -73,7 +152,7 @@ class UrlEMT:
         :returns: Lista de URLs válidas que contienen los archivos ZIP.
         """
         url = urljoin(UrlEMT.EMT, UrlEMT.GENERAL)
-        resp = requests.get(url)
+        resp = _SESSION.get(url, timeout=_TIMEOUT)
 
         if resp.status_code != 200:
             raise ConnectionError(f"Failed to connect to {url}, status code: {resp.status_code}")
@@ -89,11 +168,8 @@ class UrlEMT:
         :param html: Cadena de texto que contiene el contenido HTML.
         :returns: Conjunto de enlaces completos de archivos ZIP.
         """
-        # Patrón general para encontrar URLs de csv
-        pattern = r'(getattachment/.*?trips_\d{2}_\d{2}_[a-zA-Z]+-csv\.aspx)'
-
         # Encontrar todas las coincidencias en el HTML
-        matches = re.findall(pattern, html)
+        matches = _LINK_RE.findall(html)
         return set(f"{UrlEMT.EMT}{link}" for link in matches)
 
     @staticmethod
@@ -119,10 +195,36 @@ class UrlEMT:
 class BiciMad:
     """Clase para representar y analizar los datos de uso de BiciMad."""
 
-    def __init__(self, month: int, year: int):
+    # Columnas que usan los métodos de análisis; son las únicas que se leen del CSV por defecto
+    USED_COLS = ['idBike', 'fleet', 'trip_minutes', 'address_unlock', 'unlock_date', 'lock_date', 'station_unlock',
+                 'station_lock']
+    # Todas las columnas de interés del CSV, para quien necesite los datos completos
+    FULL_COLS = ['idBike', 'fleet', 'trip_minutes', 'geolocation_unlock', 'address_unlock', 'unlock_date', 'locktype',
+                 'unlocktype', 'geolocation_lock', 'address_lock', 'lock_date', 'station_unlock', 'unlock_station_name',
+                 'station_lock', 'lock_station_name']
+    # Columnas de texto con pocos valores distintos: se leen como categóricas para ahorrar memoria y agrupar
+    # más rápido
+    CATEGORICAL_COLS = ['fleet', 'locktype', 'unlocktype', 'station_unlock', 'station_lock', 'address_unlock',
+                        'address_lock', 'unlock_station_name', 'lock_station_name']
+    # Formato de cada columna de fecha del CSV: el día va primero en 'fecha' y las horas vienen en ISO 8601
+    DATE_FORMATS = {'fecha': '%d/%m/%Y', 'unlock_date': 'ISO8601', 'lock_date': 'ISO8601'}
+    # Motor de pd.read_csv: pyarrow reparte el parseo entre varios núcleos; si no está instalado se usa 'c'
+    CSV_ENGINE = 'pyarrow' if _HAS_PYARROW else 'c'
+    # Directorio donde se guardan los meses ya descargados; None desactiva la caché en disco
+    CACHE_DIR: Optional[Path] = Path.home() / '.cache' / 'bicimad'
+
+    # Versión del formato de la caché en disco; se incrementa si cambia el DataFrame que devuelve csv_to_df
+    # (v3: con pyarrow, las categorías de estaciones y flota ya no se guardan como float)
+    _CACHE_VERSION = 3
+
+    # Meses ya cargados, compartidos entre instancias (como máximo _DATA_CACHE_SIZE, se descarta el más antiguo)
+    _DATA_CACHE_SIZE = 8
+    _data_cache: dict[tuple[int, int, tuple[str, ...]], pd.DataFrame] = {}
+
+    def __init__(self, month: int, year: int, columns: Optional[list[str]] = None):
         self._month = month
         self._year = year
-        self._data = BiciMad.get_data(month, year)
+        self._data = BiciMad.get_data(month, year, columns=columns)
         self.clean()
 
     def __str__(self):
@@ -139,8 +241,17 @@ class BiciMad:
 
         col_names = ["fleet", "idBike", "station_lock", "station_unlock"]
         for col_name in col_names:
-            if col_name in self._data.columns:
-                self._data[col_name] = self._data[col_name].map(str).str.replace('.0', '', regex=False)
+            if col_name not in self._data.columns:
+                continue
+            col = self._data[col_name]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # En las categóricas basta con renombrar las categorías, no cada fila
+                self._data[col_name] = col.cat.rename_categories(lambda c: str(c).removesuffix('.0'))
+            else:
+                # Los identificadores se leen como float (1.0); se pasan a entero nullable y luego a texto
+                self._data[col_name] = (pd.to_numeric(col, errors='coerce')
+                                        .astype('Int64')
+                                        .astype('string'))
 
     def resume(self) -> pd.Series:
         """
@@ -149,44 +260,43 @@ class BiciMad:
         :returns: Objeto pd.Series con estadísticas como año, mes, número total de usos, tiempo total, estación más
         popular y usos desde la estación más popular.
         """
-        # Crear un objeto de tipo Series con las etiquetas especificadas
-        series_data = pd.Series(index=[
-            'year',
-            'month',
-            'total_uses',
-            'total_time',
-            'most_popular_station',
-            'uses_from_most_popular'
-        ], dtype=object)
-
-        # Llenar la Series con los valores de las funciones
-        series_data['year'] = self._year
-        series_data['month'] = self._month
-        series_data['total_uses'] = self._data.shape[0]
-        series_data['total_time'] = self._data["trip_minutes"].sum() / 60.0
-        series_data['most_popular_station'] = self.get_most_popular_stations()
-        series_data['uses_from_most_popular'] = self.get_uses_from_most_populars()
+        # Se construye la Series de una vez a partir de un dict, en lugar de asignar campo a campo
+        series_data = pd.Series({
+            'year': self._year,
+            'month': self._month,
+            'total_uses': self._data.shape[0],
+            'total_time': self._data["trip_minutes"].sum() / 60.0,
+            'most_popular_station': self.get_most_popular_stations(),
+            'uses_from_most_popular': self.get_uses_from_most_populars()
+        }, dtype=object)
 
         return series_data
 
-    def get_most_popular_stations(self) -> set[str]:
+    @cached_property
+    def _popular(self) -> tuple[set[str], int]:
         """
-        Identifica las direcciones de las estaciones de desbloqueo más populares.
+        Calcula en una sola pasada las direcciones de las estaciones de desbloqueo más populares y el número de
+        viajes que salen de ellas.
 
-        :returns: Lista de direcciones de las estaciones de desbloqueo más populares.
+        :returns: Tupla con el conjunto de direcciones y el número total de viajes desde esas estaciones.
         """
         df = self._data
-        result = df.groupby('station_unlock').size().reset_index(name='count')
-
-        max_count = result['count'].max()
-        top = result[result['count'] == max_count]
+        # Sin ordenar: para el máximo basta una pasada lineal sobre los conteos
+        counts = df['station_unlock'].value_counts(sort=False)
 
-        top_stations = top['station_unlock'].tolist()  # Convertir a lista
+        max_count = counts.max()
+        top_stations = counts[counts == max_count].index
         filtered_df = df[df['station_unlock'].isin(top_stations)]
 
-        address_unlock_top = set(filtered_df['address_unlock'])
+        return set(filtered_df['address_unlock']), len(filtered_df)
 
-        return address_unlock_top
+    def get_most_popular_stations(self) -> set[str]:
+        """
+        Identifica las direcciones de las estaciones de desbloqueo más populares.
+
+        :returns: Lista de direcciones de las estaciones de desbloqueo más populares.
+        """
+        return self._popular[0]
 
     def get_uses_from_most_populars(self) -> int:
         """
@@ -194,10 +304,7 @@ class BiciMad:
 
         :returns: Entero que representa el número total de viajes desde las estaciones más utilizadas.
         """
-        df = self._data
-        top_adresses = self.get_most_popular_stations()
-        df_filtered = df[df['address_unlock'].isin(top_adresses)]
-        return len(df_filtered)
+        return self._popular[1]
 
     def day_time(self) -> pd.Series:
         '''
@@ -206,9 +313,7 @@ class BiciMad:
         :returns: Serie de pandas con el total de horas de viaje por día, donde el índice es de tipo `DatetimeIndex`
         y el nombre de la columna es 'trip_hours'.
         '''
-        data = self._data
-        horas = data.groupby(data.index)['trip_minutes'].sum() / 60
-        horas.index = pd.to_datetime(horas.index)
+        horas = self._data['trip_minutes'].resample('D').sum() / 60
         horas = horas.rename("trip_hours")
         return horas
 
@@ -222,9 +327,10 @@ class BiciMad:
         data = self._data
         mapping = {'Monday': 'L', 'Tuesday': 'M', 'Wednesday': 'X', 'Thursday': 'J', 'Friday': 'V', 'Saturday': 'S',
                    'Sunday': 'D'}
-        data['dia'] = data.index.day_name().map(lambda x: mapping[x])
+        # Se agrupa por un índice auxiliar para no añadir columnas a self._data
+        dia = data.index.day_name().map(mapping).rename('dia')
 
-        horas = data.groupby(data['dia'])['trip_minutes'].sum() / 60
+        horas = data['trip_minutes'].groupby(dia).sum() / 60
         horas = horas.rename("trip_hours")
         return horas
 
@@ -235,10 +341,8 @@ class BiciMad:
         :returns: Serie de pandas con el número total de usos de bicicletas por día, donde el índice es de tipo
         `DatetimeIndex` y el nombre de la columna es 'Number_trips'.
         '''
-        data = self._data
-        num_usage = data.groupby(data.index.date)["idBike"].size()
+        num_usage = self._data.resample('D').size()
         num_usage = num_usage.rename("Number_trips")
-        num_usage.index = pd.to_datetime(num_usage.index)
         return num_usage
 
     def total_usage_day_station_unlock(self) -> pd.DataFrame:
@@ -251,8 +355,9 @@ class BiciMad:
             - 'count' que contiene el número total de usos de bicicletas para cada combinación de día y estación.
         '''
         df = self._data
-        df = df.groupby([pd.Grouper(freq='D'), 'station_unlock']).size().reset_index(name='count')
-        df.set_index('fecha', inplace=True)
+        # observed=True evita generar las combinaciones día-estación sin viajes de la columna categórica
+        df = df.groupby([df.index.floor('D'), 'station_unlock'], observed=True).size().reset_index(name='count')
+        df = df.rename(columns={df.columns[0]: 'fecha'}).set_index('fecha')
         return df
 
     @property
@@ -261,33 +366,159 @@ class BiciMad:
         return self._data
 
     @staticmethod
-    def get_data(month: int, year: int) -> pd.DataFrame:
+    def get_data(month: int, year: int, url_emt: Optional[UrlEMT] = None,
+                 columns: Optional[list[str]] = None) -> pd.DataFrame:
         """
         Obtiene y carga los datos de un archivo CSV en un DataFrame de pandas.
 
         :param month: Mes en formato numérico (1-12).
         :param year: Año en formato numérico (21, 22 o 23).
+        :param url_emt: Instancia de UrlEMT a reutilizar. Si no se indica, se crea una nueva.
+        :param columns: Columnas a cargar además del índice 'fecha'. Por defecto, BiciMad.USED_COLS; con
+        BiciMad.FULL_COLS se obtienen los datos completos. Los métodos de análisis necesitan las de USED_COLS.
         :returns: DataFrame de pandas con los datos cargados.
         """
-        url_emt_instance = UrlEMT()
-        csv_file = url_emt_instance.get_csv(month, year)
-        df = BiciMad.csv_to_df(csv_file)
+        if columns is None:
+            columns = BiciMad.USED_COLS
+        columns = list(columns)
+
+        key = (year, month, tuple(columns))
+        df = BiciMad._data_cache.pop(key, None)
+        if df is None:
+            df = BiciMad._read_cache(month, year, columns)
+        if df is None:
+            url_emt_instance = url_emt if url_emt is not None else UrlEMT()
+            # pd.read_csv no cierra los flujos recibidos; al salir del with se cierran el CSV, el ZIP y su temporal
+            with url_emt_instance.get_csv(month, year) as csv_file:
+                df = BiciMad.csv_to_df(csv_file, columns)
+            BiciMad._write_cache(df, month, year, columns)
+
+        # Se reinserta al final para que el mes más antiguo sea el primero en descartarse
+        BiciMad._data_cache[key] = df
+        if len(BiciMad._data_cache) > BiciMad._DATA_CACHE_SIZE:
+            del BiciMad._data_cache[next(iter(BiciMad._data_cache))]
+
+        # Cada instancia limpia sus datos in situ, así que se entrega una copia
+        return df.copy()
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Descarta los meses guardados en memoria. La caché en disco se mantiene."""
+        cls._data_cache.clear()
+
+    @staticmethod
+    def _cache_path(month: int, year: int, columns: list[str]) -> Optional[Path]:
+        """
+        Genera la ruta del fichero de caché en disco para el mes, año y columnas indicados.
+
+        :param month: Mes en formato numérico (1-12).
+        :param year: Año en formato numérico (21, 22 o 23).
+        :param columns: Columnas cargadas además del índice 'fecha'.
+        :returns: Ruta del fichero (parquet si pyarrow está instalado, pickle si no) o None si la caché está
+        desactivada.
+        """
+        if BiciMad.CACHE_DIR is None:
+            return None
+        # La huella de las columnas, fechas y categóricas evita servir ficheros escritos con otro formato
+        layout = repr((list(columns), BiciMad.DATE_FORMATS, BiciMad.CATEGORICAL_COLS))
+        digest = hashlib.sha1(layout.encode('utf-8')).hexdigest()[:8]
+        extension = 'parquet' if _HAS_PYARROW else 'pkl'
+        return Path(BiciMad.CACHE_DIR) / f"{year}_{month:02}_v{BiciMad._CACHE_VERSION}_{digest}.{extension}"
+
+    @staticmethod
+    def _read_cache(month: int, year: int, columns: list[str]) -> Optional[pd.DataFrame]:
+        """
+        Lee de la caché en disco los datos del mes, año y columnas indicados.
+
+        :param month: Mes en formato numérico (1-12).
+        :param year: Año en formato numérico (21, 22 o 23).
+        :param columns: Columnas cargadas además del índice 'fecha'.
+        :returns: DataFrame de pandas con los datos cacheados o None si no existen o no son válidos.
+        """
+        path = BiciMad._cache_path(month, year, columns)
+        if path is None or not path.exists():
+            return None
+        try:
+            if path.suffix == '.parquet':
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            # Un fichero corrupto o de otra versión de pandas/pyarrow se trata como si no estuviera en caché
+            return None
+        if df.index.name != 'fecha' or list(df.columns) != list(columns):
+            return None
         return df
 
     @staticmethod
-    def csv_to_df(data: TextIO) -> pd.DataFrame:
+    def _write_cache(df: pd.DataFrame, month: int, year: int, columns: list[str]) -> None:
         """
-        Lee un archivo CSV desde un flujo de texto y lo convierte en un DataFrame.
+        Guarda en la caché en disco los datos del mes, año y columnas indicados.
 
-        :param data: Objeto TextIO que contiene el contenido CSV, con delimitador de punto y coma (;).
-        :returns: DataFrame de pandas con columnas seleccionadas.
+        :param df: DataFrame de pandas devuelto por csv_to_df.
+        :param month: Mes en formato numérico (1-12).
+        :param year: Año en formato numérico (21, 22 o 23).
+        :param columns: Columnas cargadas además del índice 'fecha'.
         """
-        df = pd.read_csv(data, delimiter=";", index_col="fecha", parse_dates=["fecha", "lock_date", "unlock_date"],
-                         dayfirst=True)
-        df.index = pd.to_datetime(df.index)
+        path = BiciMad._cache_path(month, year, columns)
+        if path is None:
+            return
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Se escribe en un temporal propio de este proceso y se renombra para no dejar ficheros a medias
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix='.tmp', delete=False) as tmp:
+                tmp_path = Path(tmp.name)
+            if path.suffix == '.parquet':
+                df.to_parquet(tmp_path, compression='zstd')
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            # La caché es opcional: si no se puede escribir o serializar, los datos se siguen devolviendo
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
 
-        df = df[['idBike', 'fleet', 'trip_minutes', 'geolocation_unlock', 'address_unlock', 'unlock_date', 'locktype',
-                 'unlocktype', 'geolocation_lock', 'address_lock', 'lock_date', 'station_unlock', 'unlock_station_name',
-                 'station_lock', 'lock_station_name']]
+    @staticmethod
+    def csv_to_df(data: IO, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Lee un archivo CSV desde un flujo de texto o binario (UTF-8) y lo convierte en un DataFrame.
+
+        :param data: Objeto TextIO o BinaryIO que contiene el contenido CSV, con delimitador de punto y coma (;).
+        :param columns: Columnas a leer además del índice 'fecha'. Por defecto, BiciMad.USED_COLS.
+        :raises ValueError: Si alguna columna de fecha no sigue el formato de BiciMad.DATE_FORMATS.
+        :returns: DataFrame de pandas con columnas seleccionadas.
+        """
+        if columns is None:
+            columns = BiciMad.USED_COLS
+        usecols = ['fecha'] + list(columns)
+        date_formats = {col: fmt for col, fmt in BiciMad.DATE_FORMATS.items() if col in usecols}
+        dtypes = {col: 'category' for col in BiciMad.CATEGORICAL_COLS if col in usecols}
+        if BiciMad.CSV_ENGINE == 'pyarrow':
+            # Se usa pyarrow.csv directamente porque pd.read_csv(engine='pyarrow') infiere los tipos antes de aplicar
+            # dtype (las estaciones acabarían como 2.0 en lugar de '2'). Categóricas y fechas se leen como texto.
+            if isinstance(data, io.TextIOBase):
+                data = io.BytesIO(data.read().encode('utf-8'))
+            text_cols = [col for col in usecols if col in dtypes or col in date_formats]
+            table = pa_csv.read_csv(
+                data,
+                parse_options=pa_csv.ParseOptions(delimiter=';'),
+                convert_options=pa_csv.ConvertOptions(include_columns=usecols, strings_can_be_null=True,
+                                                      column_types={col: pa.string() for col in text_cols}),
+            )
+            df = table.to_pandas().astype(dtypes)
+        else:
+            df = pd.read_csv(data, delimiter=";", encoding='utf-8', usecols=usecols, dtype=dtypes)
+
+        # Las fechas se convierten igual con ambos motores: si no siguen el formato esperado se lanza un error en
+        # lugar de dejar la columna como texto (lo que haría parse_dates del motor 'c')
+        for col, fmt in date_formats.items():
+            try:
+                df[col] = pd.to_datetime(df[col], format=fmt)
+            except ValueError as e:
+                raise ValueError(f"La columna '{col}' no sigue el formato de fecha esperado ({fmt}): {e}") from e
+        df = df.set_index('fecha')
+
+        df = df[list(columns)]
 
         return df
@@ -32,38 +32,218 @@ def data_csv(files):
 def expected_result_df(files):
     """Fixture de el dataframe de salida esperado"""
     with open(files['dataframe.txt']) as f:
-            return pd.read_csv(f, sep=';', index_col=0, parse_dates=["fecha", "lock_date", "unlock_date"])
+            return pd.read_csv(f, sep=';', index_col=0, parse_dates=["fecha", "lock_date", "unlock_date"],
+                               dtype={col: 'category' for col in BiciMad.CATEGORICAL_COLS})
+
+@pytest.fixture(autouse=True)
+def clear_caches(monkeypatch, tmp_path):
+    """Fixture que vacía las cachés de UrlEMT y BiciMad entre tests y aísla la caché en disco"""
+    monkeypatch.setattr(BiciMad, 'CACHE_DIR', tmp_path / 'cache')
+    UrlEMT.invalidate_cache()
+    BiciMad.invalidate_cache()
+    yield
+    UrlEMT.invalidate_cache()
+    BiciMad.invalidate_cache()
+
+@pytest.fixture
+def c_engine(monkeypatch):
+    """Fixture que fija el motor 'c' de pandas, con el que se generó el DataFrame esperado"""
+    monkeypatch.setattr(BiciMad, 'CSV_ENGINE', 'c')
 
 # Fixture para la instancia de UrlEMT
 @pytest.fixture
 def url_emt_instance(monkeypatch, data_csv):
     """Fixture que crea una instancia de UrlEMT con un mock de enlaces válidos"""
-    monkeypatch.setattr(UrlEMT, 'select_valid_urls', lambda: None)
-    monkeypatch.setattr(UrlEMT, 'get_csv', lambda self, month, year: data_csv)
+    monkeypatch.setattr(UrlEMT, 'select_valid_urls', lambda: set())
+    monkeypatch.setattr(UrlEMT, 'get_csv', lambda self, month, year: io.StringIO(data_csv.getvalue()))
     return UrlEMT()
 
 #Tests del metodo 'BiciMad.get_data'
 @FILES
-def test_get_data(url_emt_instance, expected_result_df):
+def test_get_data(url_emt_instance, c_engine, expected_result_df):
     """
     Testea el metodo 'get_data' de la clase BiciMad. Verifica que la salida sea un DataFrame de pandas
     y que coincida con el DataFrame esperado.
     """
     result = BiciMad.get_data(11, 22)
     assert isinstance(result, pd.DataFrame)
-    assert result.equals(expected_result_df)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_get_data_reuses_url_emt(url_emt_instance, c_engine, expected_result_df, monkeypatch):
+    """
+    Testea que 'get_data' use la instancia de UrlEMT recibida en lugar de crear una nueva.
+    """
+    def fail_select_valid_urls():
+        raise AssertionError("No debería volver a consultar los enlaces")
+
+    UrlEMT.invalidate_cache()
+    monkeypatch.setattr(UrlEMT, 'select_valid_urls', fail_select_valid_urls)
+    result = BiciMad.get_data(11, 22, url_emt_instance)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_get_data_cached(url_emt_instance, c_engine, expected_result_df, monkeypatch):
+    """
+    Testea que 'get_data' reutilice los datos ya cargados, primero desde memoria y después desde disco,
+    sin volver a descargar el CSV.
+    """
+    first = BiciMad.get_data(11, 22)
+
+    def fail_get_csv(self, month, year):
+        raise AssertionError("No debería volver a descargar el CSV")
+
+    monkeypatch.setattr(UrlEMT, 'get_csv', fail_get_csv)
+    from_memory = BiciMad.get_data(11, 22)
+    assert from_memory.equals(expected_result_df[BiciMad.USED_COLS])
+    assert from_memory is not first
+
+    BiciMad.invalidate_cache()
+    from_disk = BiciMad.get_data(11, 22)
+    assert from_disk.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_get_data_invalid_disk_cache(url_emt_instance, c_engine, expected_result_df):
+    """
+    Testea que 'get_data' ignore un fichero de caché en disco corrupto o con otras columnas y vuelva a
+    descargar los datos.
+    """
+    path = BiciMad._cache_path(11, 22, BiciMad.USED_COLS)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'no es un fichero de datos')
+
+    result = BiciMad.get_data(11, 22)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_get_data_stale_disk_cache(url_emt_instance, c_engine, expected_result_df, data_csv):
+    """
+    Testea que 'get_data' no sirva desde disco un DataFrame con columnas distintas de las esperadas.
+    """
+    stale = BiciMad.csv_to_df(data_csv, BiciMad.FULL_COLS)
+    BiciMad._write_cache(stale, 11, 22, BiciMad.USED_COLS)
+
+    result = BiciMad.get_data(11, 22)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_get_data_full_cols(url_emt_instance, c_engine, expected_result_df):
+    """
+    Testea que 'get_data' y 'BiciMad' devuelvan todas las columnas al pedir BiciMad.FULL_COLS, sin mezclarlas
+    en caché con las de BiciMad.USED_COLS.
+    """
+    used = BiciMad.get_data(11, 22)
+    assert used.equals(expected_result_df[BiciMad.USED_COLS])
+
+    full = BiciMad.get_data(11, 22, columns=BiciMad.FULL_COLS)
+    assert full.equals(expected_result_df)
+
+    bicimad_inst = BiciMad(11, 22, columns=BiciMad.FULL_COLS)
+    assert list(bicimad_inst.data.columns) == BiciMad.FULL_COLS
+    assert bicimad_inst.get_uses_from_most_populars() == 4
+
+@FILES
+def test_get_data_closes_csv(url_emt_instance, monkeypatch, data_csv):
+    """
+    Testea que 'get_data' cierre el flujo devuelto por 'get_csv' después de leerlo.
+    """
+    streams = []
+
+    def fake_get_csv(self, month, year):
+        streams.append(io.StringIO(data_csv.getvalue()))
+        return streams[-1]
+
+    monkeypatch.setattr(UrlEMT, 'get_csv', fake_get_csv)
+    BiciMad.get_data(11, 22)
+    assert len(streams) == 1 and streams[0].closed
+
+@FILES
+def test_get_data_disk_cache_write_error(url_emt_instance, c_engine, expected_result_df, monkeypatch):
+    """
+    Testea que un error al serializar la caché en disco no impida devolver los datos ni deje temporales.
+    """
+    def fail_serialize(self, path, *args, **kwargs):
+        Path(path).write_bytes(b'a medias')
+        raise TypeError("no se puede serializar")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', fail_serialize)
+    monkeypatch.setattr(pd.DataFrame, 'to_pickle', fail_serialize)
+
+    result = BiciMad.get_data(11, 22)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+    assert list(BiciMad.CACHE_DIR.iterdir()) == []
 
 #Tests del metodo 'BiciMad.csv_to_df'
 @FILES
-def test_csv_to_df(data_csv, expected_result_df):
+def test_csv_to_df(data_csv, c_engine, expected_result_df):
     """
     Testea el metodo 'csv_to_df' de la clase BiciMad. Comprueba que convierte correctamente un archivo CSV
     en un DataFrame de pandas y que este sea igual al DataFrame esperado.
     """
     result = BiciMad.csv_to_df(data_csv)
     assert isinstance(result, pd.DataFrame)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+@FILES
+def test_csv_to_df_full_cols(data_csv, c_engine, expected_result_df):
+    """
+    Testea el metodo 'csv_to_df' pidiendo todas las columnas. Comprueba que el DataFrame coincide con el
+    DataFrame esperado completo.
+    """
+    result = BiciMad.csv_to_df(data_csv, BiciMad.FULL_COLS)
+    assert isinstance(result, pd.DataFrame)
     assert result.equals(expected_result_df)
 
+@FILES
+@pytest.mark.parametrize("engine", ['c', 'pyarrow'])
+def test_csv_to_df_wrong_date_format(data_csv, monkeypatch, engine):
+    """
+    Testea que 'csv_to_df' lance ValueError con ambos motores si una fecha no sigue el formato esperado.
+    """
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(BiciMad, 'CSV_ENGINE', engine)
+    content = data_csv.getvalue().replace('01/11/2022', '2022-11-01', 1)
+
+    with pytest.raises(ValueError, match="La columna 'fecha' no sigue el formato de fecha esperado"):
+        BiciMad.csv_to_df(io.StringIO(content))
+
+@FILES
+def test_csv_to_df_pyarrow(data_csv, expected_result_df, monkeypatch):
+    """
+    Testea el metodo 'csv_to_df' con el motor pyarrow. Comprueba que el DataFrame es idéntico al obtenido con
+    el motor 'c', tanto desde un flujo de texto como desde uno binario y con todas las columnas.
+    """
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(BiciMad, 'CSV_ENGINE', 'pyarrow')
+    content = data_csv.getvalue()
+
+    result = BiciMad.csv_to_df(io.StringIO(content))
+    assert isinstance(result, pd.DataFrame)
+    assert result.equals(expected_result_df[BiciMad.USED_COLS])
+
+    result = BiciMad.csv_to_df(io.BytesIO(content.encode('utf-8')), BiciMad.FULL_COLS)
+    assert result.equals(expected_result_df)
+
+@FILES
+def test_clean_pyarrow_matches_c(url_emt_instance, monkeypatch):
+    """
+    Testea que, tras 'clean', las columnas categóricas leídas con pyarrow (categorías float como 2.0) coincidan
+    con las leídas con el motor 'c' (categorías de texto como '2').
+    """
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(BiciMad, 'CACHE_DIR', None)
+
+    monkeypatch.setattr(BiciMad, 'CSV_ENGINE', 'c')
+    c_inst = BiciMad(11, 22)
+    BiciMad.invalidate_cache()
+    monkeypatch.setattr(BiciMad, 'CSV_ENGINE', 'pyarrow')
+    pyarrow_inst = BiciMad(11, 22)
+
+    for col in ['station_unlock', 'station_lock', 'fleet', 'address_unlock']:
+        assert pyarrow_inst.data[col].astype(object).equals(c_inst.data[col].astype(object)), \
+            f"La columna '{col}' no coincide entre los motores pyarrow y c"
+
 #Tests del metodo 'BiciMad.data'
 @FILES
 def test_data(url_emt_instance):
@@ -187,6 +367,7 @@ def test_weekday_time(url_emt_instance):
     expected_output_series = pd.Series(expected_output_data, dtype=float).rename("trip_hours")
     expected_output_series.index.name = 'dia'
 
+    columns_before = list(bicimad_inst.data.columns)
     result = bicimad_inst.weekday_time()
 
     result_rounded = result.round(5)
@@ -194,6 +375,8 @@ def test_weekday_time(url_emt_instance):
 
     assert isinstance(result, pd.Series)
     assert result_rounded.equals(expected_output_series_rounded)
+    # Verifica que el método no modifica el DataFrame de la instancia
+    assert list(bicimad_inst.data.columns) == columns_before
 
 #Test del metodo 'BiciMad.total_usage_day'
 @FILES
@@ -239,6 +422,9 @@ def test_total_usage_day_station_unlock(url_emt_instance):
     result = bicimad_inst.total_usage_day_station_unlock()
 
     assert isinstance(result, pd.DataFrame)
+    assert result.index.name == 'fecha'
+    # Solo deben aparecer las combinaciones de día y estación con algún viaje
+    assert len(result) == len(expected_output)
 
     for idx, row in expected_output.iterrows():
         # Filtrar el dataframe resultante por el índice y station_unlock
@@ -1,5 +1,6 @@
 import io
 import re
+import tempfile
 import pytest
 import requests
 from pathlib import Path
@@ -34,37 +35,45 @@ def data_zip(files):
     with open(files['trips_22_11_November-csv.zip'], 'rb') as f:
             return f.read()
 
-#Fixtures para mocks de requests
+@pytest.fixture(autouse=True)
+def clear_url_cache():
+    """Fixture que vacía la caché de enlaces de UrlEMT entre tests"""
+    UrlEMT.invalidate_cache()
+    yield
+    UrlEMT.invalidate_cache()
+
+#Fixtures para mocks de la sesión HTTP
 @pytest.fixture
 def mock_get_valid_html(monkeypatch, data_html):
-    """Fixture para mockear requests.get con una respuesta válida de HTML"""
+    """Fixture para mockear la sesión HTTP con una respuesta válida de HTML"""
     mock_response = requests.Response()
     mock_response.status_code = 200
     mock_response._content = data_html.encode('utf-8')
 
-    monkeypatch.setattr(requests, 'get', lambda url: mock_response)
+    monkeypatch.setattr('bicimad.bicimad._SESSION.get', lambda url, **kwargs: mock_response)
 
     return mock_response
 
 @pytest.fixture
 def mock_get_valid_zip(monkeypatch, data_zip):
-    """Fixture para mockear requests.get con una respuesta válida de ZIP"""
+    """Fixture para mockear la sesión HTTP con una respuesta válida de ZIP"""
     mock_response = requests.Response()
     mock_response.status_code = 200
-    mock_response._content = data_zip
+    mock_response.raw = io.BytesIO(data_zip)
 
-    monkeypatch.setattr(requests, 'get', lambda url: mock_response)
+    monkeypatch.setattr('bicimad.bicimad._SESSION.get', lambda url, **kwargs: mock_response)
 
     return mock_response
 
 @pytest.fixture
 def mock_get_error(monkeypatch):
-    """Fixture para mockear requests.get con una respuesta de error"""
+    """Fixture para mockear la sesión HTTP con una respuesta de error"""
     mock_response = requests.Response()
     mock_response.status_code = 404
     mock_response._content = None
+    mock_response.raw = io.BytesIO()
 
-    monkeypatch.setattr(requests, 'get', lambda url: mock_response)
+    monkeypatch.setattr('bicimad.bicimad._SESSION.get', lambda url, **kwargs: mock_response)
     return mock_response
 
 # Fixture para la instancia de UrlEMT
@@ -135,6 +144,27 @@ def test_select_valid_urls_connection_error(mock_get_error):
                                                         r"Datos-estaticos/Datos-generales-(1), status code: 404")):
         UrlEMT.select_valid_urls()
 
+def test_select_valid_urls_cached_between_instances(monkeypatch):
+    """Prueba que varias instancias de UrlEMT reutilicen los enlaces descargados por la primera"""
+    calls = []
+
+    def fake_select_valid_urls():
+        calls.append(1)
+        return {"https://opendata.emtmadrid.es/getattachment/trips_22_03_march-csv.aspx"}
+
+    monkeypatch.setattr(UrlEMT, 'select_valid_urls', fake_select_valid_urls)
+    first = UrlEMT()
+    second = UrlEMT()
+    assert len(calls) == 1
+    assert first.enlaces_validos is second.enlaces_validos
+    assert first._indice is second._indice
+    # Los enlaces compartidos no se pueden modificar desde una instancia
+    assert isinstance(first.enlaces_validos, frozenset)
+
+    UrlEMT.invalidate_cache()
+    UrlEMT()
+    assert len(calls) == 2
+
 # Tests del metodo 'UrlEMT.get_lins'
 @pytest.mark.parametrize(
     "expected_links", [
@@ -194,12 +224,42 @@ def test_get_csv_valid_url(url_emt_instance, mock_get_valid_zip, month, year, ex
     """Prueba que get_csv procese correctamente un archivo ZIP con los encabezados correctos"""
     result = url_emt_instance.get_csv(month, year)
 
-    # Verifica que el resultado es una instancia de StringIO
-    assert isinstance(result, io.StringIO)
+    # Verifica que el resultado es un flujo binario
+    assert isinstance(result, io.BufferedIOBase)
 
     # Obtener los encabezados del CSV
-    headers = result.readline().strip().split(';')
+    headers = result.readline().decode('utf-8').strip().split(';')
 
     # Verifica que las columnas del CSV coinciden con los títulos esperados
     assert headers == expected_headers, f"Headers do not match. Expected: {expected_headers}, but got: {headers}"
 
+@pytest.fixture
+def spooled_files(monkeypatch):
+    """Fixture que registra los ficheros temporales creados por get_csv"""
+    created = []
+    original = tempfile.SpooledTemporaryFile
+
+    def recording_spooled_file(*args, **kwargs):
+        created.append(original(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(tempfile, 'SpooledTemporaryFile', recording_spooled_file)
+    return created
+
+@FILES
+def test_get_csv_close_releases_zip(url_emt_instance, mock_get_valid_zip, spooled_files):
+    """Prueba que al cerrar el flujo de get_csv se cierre también el fichero temporal con el ZIP"""
+    with url_emt_instance.get_csv(11, 22) as result:
+        assert result.readline().startswith(b'fecha;')
+        assert not spooled_files[0].closed
+
+    assert result.closed
+    assert spooled_files[0].closed
+
+@FILES
+def test_get_csv_missing_member_releases_zip(url_emt_instance, mock_get_valid_zip, spooled_files):
+    """Prueba que get_csv cierre el fichero temporal si el ZIP no contiene el CSV esperado"""
+    with pytest.raises(KeyError):
+        url_emt_instance.get_csv(3, 22)
+
+    assert spooled_files[0].closed